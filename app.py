@@ -1,27 +1,126 @@
 import os
+import io
+import gzip
+import hashlib
+import logging
+import logging.handlers
+import queue
+import csv
 import json
 import re
+import sqlite3
+import threading
+import time
+import atexit
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from collections import Counter
+from collections import Counter, defaultdict
+from contextlib import closing
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
 from typing import Any, Optional
 import pandas as pd
-from flask import Flask, render_template, jsonify, request, send_file
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
+from flask import Flask, Response, render_template, jsonify, request, send_file, g, has_app_context
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 load_dotenv()
 
+# Route handlers log exceptions through a queue so the traceback is written to stderr off the request thread
+logger = logging.getLogger('youtube_niche_pro')
+logger.setLevel(logging.INFO)
+log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['PREFERRED_URL_SCHEME'] = 'https'
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# Large /search and /analyze payloads: skip key sorting and ASCII escaping when serializing
+app.json.sort_keys = False
+app.json.ensure_ascii = False
+app.json.compact = True
+# Behind nginx/Apache with X-Sendfile support, let the front server stream CSV exports
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE') == '1'
+
+CACHE_DB = 'data/cache.sqlite'
+# Cached responses older than this are refetched; a channel's uploads playlist ID never changes
+CACHE_TTL = timedelta(days=1)
+CACHE_PERMANENT_NAMESPACES = frozenset({'channel_uploads_playlist'})
+# After a quotaExceeded error, API calls fail fast for this long instead of spending a round trip each
+QUOTA_BACKOFF = timedelta(minutes=5)
+
+# YouTube Data API accepts up to 50 comma-separated IDs per list request
+YOUTUBE_MAX_IDS = 50
+MAX_WORKERS = 8
+# search.list costs 100 units regardless of maxResults, so related videos are fetched once at the largest size any route uses
+MAX_RELATED_VIDEOS = 10
+
+# Partial-response masks: only the fields each caller reads are downloaded and parsed.
+# A mask can drop an object whose selected subfields are all absent, so readers use .get('statistics', {})
+VIDEO_FIELDS = 'items(id,snippet(title,channelId,channelTitle,publishedAt,tags),statistics(viewCount,likeCount,commentCount),contentDetails/duration)'
+CHANNEL_DETAILS_FIELDS = 'items(id,snippet(title,publishedAt),statistics(hiddenSubscriberCount,subscriberCount,videoCount,viewCount))'
+CHANNEL_UPLOADS_FIELDS = 'items/contentDetails/relatedPlaylists/uploads'
+ACCOUNT_FIELDS = 'items(id,snippet(title,thumbnails/default/url),statistics(hiddenSubscriberCount,subscriberCount))'
+PLAYLIST_ITEM_FIELDS = 'items/contentDetails/videoId,nextPageToken'
+SEARCH_FIELDS = 'items/id/videoId,nextPageToken'
+RELATED_SEARCH_FIELDS = 'items(id/videoId,snippet(title,channelTitle))'
+
+# An ID after "v=" or "/" (watch, youtu.be, embed, shorts URLs), or a bare 11-character ID
+VIDEO_ID_PATTERN = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})|^([0-9A-Za-z_-]{11})$')
+DURATION_PATTERN = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'how', 'what', 'why', 'when', 'where', 'who', 'this', 'that', 'these', 'those', 'i', 'you', 'we', 'they', 'my', 'your', 'our', 'their', 'is', 'are', 'was', 'were', 'be', 'been', 'being'})
+
+cache_connections = threading.local()
+# Compact encoder reused for every cache write; whitespace is pure overhead in a machine cache
+cache_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+# Last CSV bytes this worker wrote per path (plain and gzipped), with the file's mtime so another worker's newer file wins
+csv_exports: dict[str, tuple[int, bytes, bytes]] = {}
+# JSON responses smaller than this are sent uncompressed; gzip overhead outweighs the saving
+COMPRESS_MIN_SIZE = 1024
 
-CACHE_FILE = 'data/cache.json'
+connection_settings_cache: dict[str, Any] = {'data': None, 'expires_at': None, 'fetched_at': None}
+# Tokens are refreshed in the background inside the refresh window and in the foreground inside the margin
+TOKEN_REFRESH_WINDOW = timedelta(minutes=5)
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=1)
+token_refresh_lock = threading.Lock()
+# /api/account/info and disconnect reuse a connection fetched within this window instead of calling the connector
+CONNECTION_INFO_TTL = timedelta(seconds=60)
 
-connection_settings_cache: dict[str, Any] = {'data': None, 'expires_at': None}
+# Keep-alive session for the Replit connector so token refreshes skip the TCP+TLS handshake
+connector_session = requests.Session()
+connector_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10))
+connector_session.headers['Accept'] = 'application/json'
+
+YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3'
+# Transient API failures are retried with backoff; quota errors (403) are not, since they will not clear
+YOUTUBE_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({'GET'}),
+    raise_on_status=False
+)
+
+youtube_client_cache: dict[str, Any] = {'auth': None, 'session': None}
+youtube_client_lock = threading.Lock()
+quota_backoff: dict[str, Any] = {'until': 0.0}
+
+# The dashboard polls /api/account/info; the connected channel rarely changes within a minute
+OWN_CHANNEL_TTL = timedelta(seconds=60)
+COUNT_SUFFIXES = ((1_000_000_000, 'B'), (1_000_000, 'M'), (1_000, 'K'))
+own_channel_cache: dict[str, Any] = {'auth': None, 'response': None, 'expires_at': 0.0}
 
 def get_replit_connector_headers():
     """Get headers for Replit connector API calls"""
@@ -42,16 +141,38 @@ def get_replit_connector_headers():
         'X_REPLIT_TOKEN': x_replit_token
     }
 
-def get_youtube_connection_info():
-    """Get YouTube connection info and settings"""
+def connection_expiry(connection_settings):
+    """Parse the access token expiry from connector settings, defaulting to 30 minutes"""
+    expires_at_str = connection_settings.get('settings', {}).get('expires_at')
+    if expires_at_str:
+        try:
+            return datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
+        except:
+            pass
+    return datetime.now(timezone.utc) + timedelta(minutes=30)
+
+def get_youtube_connection_info(max_age=CONNECTION_INFO_TTL):
+    """Get YouTube connection info and settings
+    
+    Reuses the connection in connection_settings_cache when it was fetched
+    less than max_age ago; pass max_age=None to always ask the connector.
+    """
+    global connection_settings_cache
+    
+    cache = connection_settings_cache
+    if (max_age is not None and cache['data'] and cache['fetched_at'] and
+            datetime.now(timezone.utc) - cache['fetched_at'] < max_age):
+        return cache['data']
+    
     hostname = os.getenv('REPLIT_CONNECTORS_HOSTNAME')
     if not hostname:
         raise Exception("Replit environment not configured")
     
     headers = get_replit_connector_headers()
-    response = requests.get(
+    response = connector_session.get(
         f'https://{hostname}/api/v2/connection?include_secrets=true&connector_names=youtube',
-        headers=headers
+        headers=headers,
+        timeout=10
     )
     
     if response.status_code != 200:
@@ -61,222 +182,493 @@ def get_youtube_connection_info():
     if not connection_data.get('items'):
         return None
     
-    return connection_data['items'][0]
-
-def get_access_token(force_refresh=False):
-    """Get fresh access token, checking cache first
-    
-    Args:
-        force_refresh: If True, bypass cache and get fresh token
-    """
-    global connection_settings_cache
-    
-    # Add 5 minute buffer before expiration to avoid edge cases
-    buffer_time = timedelta(minutes=5)
-    
-    if (not force_refresh and 
-        connection_settings_cache['data'] and 
-        connection_settings_cache['expires_at'] and 
-        datetime.now(timezone.utc) < (connection_settings_cache['expires_at'] - buffer_time)):
-        print("Using cached access token")
-        return connection_settings_cache['data'].get('settings', {}).get('access_token')
+    connection_settings = connection_data['items'][0]
+    # Rebind in one step so concurrent readers never see a token paired with another token's expiry
+    connection_settings_cache = {
+        'data': connection_settings,
+        'expires_at': connection_expiry(connection_settings),
+        'fetched_at': datetime.now(timezone.utc)
+    }
     
+    return connection_settings
+
+def refresh_access_token():
+    """Fetch a new access token from the connector and swap it into the cache"""
     print("Fetching fresh access token from connector")
-    connection_settings = get_youtube_connection_info()
+    connection_settings = get_youtube_connection_info(max_age=None)
     
     if not connection_settings:
         raise Exception("YouTube not connected. Please set up the YouTube integration.")
     
-    settings = connection_settings.get('settings', {})
-    access_token = settings.get('access_token')
+    access_token = connection_settings.get('settings', {}).get('access_token')
     
     if not access_token:
         raise Exception("No access token found in connector settings")
     
-    expires_at_str = settings.get('expires_at')
-    if expires_at_str:
+    return access_token
+
+def refresh_access_token_in_background():
+    """Refresh the token on a daemon thread unless a refresh is already running"""
+    if not token_refresh_lock.acquire(blocking=False):
+        return
+    
+    def run():
         try:
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            connection_settings_cache['expires_at'] = expires_at
-        except:
-            connection_settings_cache['expires_at'] = datetime.now(timezone.utc) + timedelta(minutes=30)
-    else:
-        connection_settings_cache['expires_at'] = datetime.now(timezone.utc) + timedelta(minutes=30)
+            refresh_access_token()
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+        finally:
+            token_refresh_lock.release()
     
-    connection_settings_cache['data'] = connection_settings
+    threading.Thread(target=run, daemon=True).start()
+
+def get_access_token(force_refresh=False):
+    """Get fresh access token, checking cache first
     
-    return access_token
+    A cached token within TOKEN_REFRESH_WINDOW of expiry is still returned,
+    while a background thread fetches its replacement, so requests only
+    block on the connector when the token is missing or about to expire.
+    
+    Args:
+        force_refresh: If True, bypass cache and get fresh token
+    """
+    cache = connection_settings_cache
+    
+    access_token = cache['data'].get('settings', {}).get('access_token') if cache['data'] else None
+    
+    if not force_refresh and access_token and cache['expires_at']:
+        time_left = cache['expires_at'] - datetime.now(timezone.utc)
+        if time_left > TOKEN_EXPIRY_MARGIN:
+            if time_left < TOKEN_REFRESH_WINDOW:
+                refresh_access_token_in_background()
+            print("Using cached access token")
+            return access_token
+    
+    return refresh_access_token()
+
+def build_youtube_session(access_token=None, api_key=None):
+    """Create a pooled HTTP session authenticated for the YouTube Data API"""
+    session = requests.Session()
+    # Room for two concurrent run_in_threads fan-outs (see /analyze)
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2 * MAX_WORKERS, max_retries=YOUTUBE_RETRY))
+    session.headers['Accept'] = 'application/json'
+    if access_token:
+        session.headers['Authorization'] = f'Bearer {access_token}'
+    else:
+        session.params = {'key': api_key}
+    return session
 
 def get_youtube_client():
     """Get authenticated YouTube client using Replit integration
     
-    WARNING: Never cache this client.
-    Access tokens expire, so a new client must be created each time.
-    Always call this function again to get a fresh client.
+    The client is a requests.Session that keeps HTTPS connections to the
+    YouTube API alive. It is reused only while the access token (or
+    fallback API key) is unchanged, so an expired or refreshed token
+    always gets a new session.
     """
     try:
         access_token = get_access_token()
         
         print(f"Successfully retrieved access token")
-        
-        credentials = Credentials(token=access_token)
-        
-        youtube = build('youtube', 'v3', credentials=credentials)
-        print("YouTube client created successfully")
-        return youtube
+        auth = ('token', access_token)
         
     except Exception as e:
         print(f"Error getting YouTube client with connector: {e}")
         api_key = os.getenv('YOUTUBE_API_KEY')
-        if api_key:
-            print("Falling back to YOUTUBE_API_KEY from environment")
-            return build('youtube', 'v3', developerKey=api_key)
-        raise Exception(f"YouTube authentication failed: {e}")
-
-def extract_video_id(url):
-    """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-        r'(?:embed\/)([0-9A-Za-z_-]{11})',
-        r'^([0-9A-Za-z_-]{11})$'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
-
-def load_cache():
-    """Load cached API responses"""
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_cache(cache):
-    """Save API responses to cache"""
+        if not api_key:
+            raise Exception(f"YouTube authentication failed: {e}")
+        print("Falling back to YOUTUBE_API_KEY from environment")
+        auth = ('key', api_key)
+    
+    with youtube_client_lock:
+        if youtube_client_cache['auth'] != auth:
+            if auth[0] == 'token':
+                youtube_client_cache['session'] = build_youtube_session(access_token=auth[1])
+            else:
+                youtube_client_cache['session'] = build_youtube_session(api_key=auth[1])
+            youtube_client_cache['auth'] = auth
+            print("YouTube client created successfully")
+        return youtube_client_cache['session']
+
+def reset_youtube_client():
+    """Drop the cached YouTube session so the next call builds one with fresh credentials"""
+    with youtube_client_lock:
+        session = youtube_client_cache['session']
+        youtube_client_cache['auth'] = None
+        youtube_client_cache['session'] = None
+    if session is not None:
+        session.close()
+
+def format_count(count):
+    """Abbreviate a count for display, e.g. 1234 -> '1.2K', 5600000 -> '5.6M'"""
+    for threshold, suffix in COUNT_SUFFIXES:
+        if count >= threshold:
+            return f'{count/threshold:.1f}{suffix}'
+    return str(count)
+
+def get_own_channel(youtube):
+    """Fetch channels.list(mine=true), cached for OWN_CHANNEL_TTL per credential
+    
+    Keyed by a hash of the session's Authorization header, so a refreshed
+    or different token never sees another credential's channel.
+    """
+    global own_channel_cache
+    
+    auth = hashlib.sha256(youtube.headers.get('Authorization', '').encode()).hexdigest()
+    cache = own_channel_cache
+    if cache['auth'] == auth and time.time() < cache['expires_at']:
+        return cache['response']
+    
+    response = youtube_api_get(
+        youtube, 'channels',
+        part='snippet,statistics',
+        mine='true',
+        fields=ACCOUNT_FIELDS
+    )
+    own_channel_cache = {'auth': auth, 'response': response, 'expires_at': time.time() + OWN_CHANNEL_TTL.total_seconds()}
+    return response
+
+def youtube_api_get(youtube, resource, **params):
+    """Call a YouTube Data API list endpoint and return the decoded JSON response
+    
+    Raises an Exception carrying the HTTP status and error reason
+    (e.g. quotaExceeded) when the API responds with an error. Once the
+    quota is exhausted, calls fail without a request for QUOTA_BACKOFF.
+    """
+    if time.time() < quota_backoff['until']:
+        raise Exception("YouTube API error: HTTP 403 quotaExceeded: quota exhausted, retry later")
+    
+    response = youtube.get(f'{YOUTUBE_API_URL}/{resource}', params=params, timeout=30)
+    
+    if response.status_code != 200:
+        try:
+            error = response.json().get('error', {})
+        except ValueError:
+            error = {}
+        reason = (error.get('errors') or [{}])[0].get('reason', 'unknown')
+        if reason in ('quotaExceeded', 'dailyLimitExceeded'):
+            quota_backoff['until'] = time.time() + QUOTA_BACKOFF.total_seconds()
+        raise Exception(f"YouTube API error: HTTP {response.status_code} {reason}: {error.get('message', response.text)}")
+    
+    return response.json()
+
+def extract_video_ids(urls):
+    """Extract video IDs from YouTube URLs, skipping URLs without one"""
+    return [match.group(1) or match.group(2) for match in map(VIDEO_ID_PATTERN.search, urls) if match]
+
+def init_cache_db():
+    """Create the SQLite API response cache and switch it to WAL mode"""
     os.makedirs('data', exist_ok=True)
-    with open(CACHE_FILE, 'w') as f:
-        json.dump(cache, f, indent=2)
+    with closing(sqlite3.connect(CACHE_DB, timeout=30)) as conn:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'stored_at REAL NOT NULL DEFAULT 0, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        conn.commit()
+
+init_cache_db()
+
+def get_cache_conn():
+    """Get this thread's cache connection
+    
+    Each thread has its own connection so WAL readers never wait on each
+    other; SQLite's own locking (with a busy timeout) serialises writers.
+    """
+    conn = getattr(cache_connections, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_DB, timeout=30)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        cache_connections.conn = conn
+    return conn
+
+def cache_cutoff(namespace):
+    """Oldest stored_at timestamp still considered fresh for a namespace"""
+    if namespace in CACHE_PERMANENT_NAMESPACES:
+        return 0
+    return time.time() - CACHE_TTL.total_seconds()
+
+def cache_get(namespace, key):
+    """Return a cached API response, or None if it is not cached or has expired"""
+    row = get_cache_conn().execute(
+        'SELECT value FROM cache WHERE namespace = ? AND key = ? AND stored_at >= ?',
+        (namespace, key, cache_cutoff(namespace))
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+def cache_put(namespace, key, value):
+    """Store a single API response in the cache"""
+    conn = get_cache_conn()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)',
+            (namespace, key, cache_encoder.encode(value), time.time())
+        )
+
+def cache_get_many(namespace, keys):
+    """Return {key: response} for every key that is freshly cached, in one query per 500 keys"""
+    conn = get_cache_conn()
+    cutoff = cache_cutoff(namespace)
+    found = {}
+    for batch in chunk_ids(list(keys), 500):
+        placeholders = ','.join('?' * len(batch))
+        rows = conn.execute(
+            f'SELECT key, value FROM cache WHERE namespace = ? AND stored_at >= ? AND key IN ({placeholders})',
+            (namespace, cutoff, *batch)
+        ).fetchall()
+        found.update((key, json.loads(value)) for key, value in rows)
+    return found
+
+def cache_put_many(namespace, items):
+    """Store several API responses in a single transaction"""
+    stored_at = time.time()
+    rows = [(namespace, key, cache_encoder.encode(value), stored_at) for key, value in items.items()]
+    if not rows:
+        return
+    conn = get_cache_conn()
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)',
+            rows
+        )
+
+def write_csv(path, rows, export=False):
+    """Atomically write a list of dicts to a CSV file without building a DataFrame
+    
+    For files a download route serves (export=True), the bytes are also kept
+    in csv_exports, with a gzipped copy compressed once here, so the route
+    can serve them without reading the file back.
+    """
+    buffer = io.StringIO(newline='')
+    if rows:
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()), lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    data = buffer.getvalue().encode('utf-8')
+    # Write beside the target and rename over it, so a concurrent /export never sends a half-written file
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    # rename keeps the inode's mtime; reading it first avoids pairing our bytes with another writer's file
+    mtime_ns = os.stat(tmp_path).st_mtime_ns
+    os.replace(tmp_path, path)
+    if export:
+        csv_exports[path] = (mtime_ns, data, gzip.compress(data, compresslevel=6))
+
+def send_csv_export(path, download_name):
+    """Send a CSV export from memory when this worker wrote the current file, else from disk"""
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = csv_exports.get(path)
+    if cached and cached[0] == mtime_ns and not app.config['USE_X_SENDFILE']:
+        _, data, gzipped = cached
+        use_gzip = request.accept_encodings['gzip'] > 0
+        response = Response(
+            gzipped if use_gzip else data,
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
+        )
+        response.vary.add('Accept-Encoding')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        # Repeat downloads of an unchanged export get a 304 instead of the body
+        response.set_etag(f'{mtime_ns}-{len(data)}' + ('-gzip' if use_gzip else ''))
+        return response.make_conditional(request)
+    return send_file(path, as_attachment=True, download_name=download_name, conditional=True, etag=True)
+
+def chunk_ids(ids, size=YOUTUBE_MAX_IDS):
+    """Split IDs into batches that fit in a single API list request"""
+    return [ids[i:i+size] for i in range(0, len(ids), size)]
+
+def run_in_threads(youtube, func, items, max_workers=MAX_WORKERS):
+    """Call func(youtube, item) for every item concurrently, preserving order
+    
+    Workers share the client's connection pool. A single item runs inline.
+    """
+    if len(items) <= 1:
+        return [func(youtube, item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda item: func(youtube, item), items))
+
+def request_memo(name):
+    """Per-request dict on flask.g, or a throwaway dict outside an app context
+    
+    Worker threads from run_in_threads have no app context, so they skip
+    the memo and rely on the SQLite cache alone.
+    """
+    if not has_app_context():
+        return {}
+    return g.setdefault(name, {})
+
+video_snippet_fields = itemgetter('title', 'channelId', 'channelTitle', 'publishedAt')
 
 def get_video_details(youtube, video_ids):
     """Fetch video details from YouTube API with efficient batching (1 unit per video)"""
-    cache = load_cache()
-    results = []
+    video_ids = list(dict.fromkeys(video_ids))
+    # IDs already resolved earlier in this request skip the cache and the API
+    memo = request_memo('video_details')
+    pending_ids = [video_id for video_id in video_ids if video_id not in memo]
+    cached = cache_get_many('videos', pending_ids)
     uncached_ids = []
-    
-    for video_id in video_ids:
-        if video_id in cache.get('videos', {}):
-            results.append(cache['videos'][video_id])
+    for video_id in pending_ids:
+        video = cached.get(video_id)
+        if video is not None:
+            memo[video_id] = video
         else:
             uncached_ids.append(video_id)
     
+    def fetch_batch(client, batch):
+        print(f"Fetching details for {len(batch)} videos (1 quota unit)")
+        try:
+            return youtube_api_get(
+                client, 'videos',
+                part='snippet,statistics,contentDetails',
+                id=','.join(batch),
+                fields=VIDEO_FIELDS
+            )
+        except Exception as e:
+            print(f"Error fetching video details: {e}")
+            return {}
+    
     if uncached_ids:
+        fetched = {}
         try:
             # Batch requests: YouTube API allows up to 50 IDs per request
-            # Cost: 1 quota unit per request
-            for i in range(0, len(uncached_ids), 50):
-                batch = uncached_ids[i:i+50]
-                print(f"Fetching details for {len(batch)} videos (1 quota unit)")
-                
-                response = youtube.videos().list(
-                    part='snippet,statistics,contentDetails',
-                    id=','.join(batch)
-                ).execute()
-                
+            # Cost: 1 quota unit per request, batches are fetched concurrently
+            for response in run_in_threads(youtube, fetch_batch, chunk_ids(uncached_ids)):
                 for item in response.get('items', []):
+                    snippet = item['snippet']
+                    statistics_get = item.get('statistics', {}).get
+                    title, channel_id, channel_title, published_at = video_snippet_fields(snippet)
                     video_data = {
                         'video_id': item['id'],
-                        'title': item['snippet']['title'],
-                        'channel_id': item['snippet']['channelId'],
-                        'channel_title': item['snippet']['channelTitle'],
-                        'upload_date': item['snippet']['publishedAt'],
-                        'views': int(item['statistics'].get('viewCount', 0)),
-                        'likes': int(item['statistics'].get('likeCount', 0)),
-                        'comments': int(item['statistics'].get('commentCount', 0)),
+                        'title': title,
+                        'channel_id': channel_id,
+                        'channel_title': channel_title,
+                        'upload_date': published_at,
+                        'views': int(statistics_get('viewCount', 0)),
+                        'likes': int(statistics_get('likeCount', 0)),
+                        'comments': int(statistics_get('commentCount', 0)),
                         'duration': item['contentDetails']['duration'],
-                        'tags': item['snippet'].get('tags', [])
+                        'tags': snippet.get('tags', [])
                     }
-                    results.append(video_data)
-                    
-                    if 'videos' not in cache:
-                        cache['videos'] = {}
-                    cache['videos'][item['id']] = video_data
-            
-            save_cache(cache)
+                    fetched[item['id']] = video_data
         except Exception as e:
             print(f"Error fetching video details: {e}")
+        memo.update(fetched)
+        cache_put_many('videos', fetched)
     
-    return results
+    return [memo[video_id] for video_id in video_ids if video_id in memo]
 
-def get_channel_stats(youtube, channel_ids):
-    """Fetch channel statistics"""
-    cache = load_cache()
-    results = {}
-    uncached_ids = []
+def get_channel_details(youtube, channel_ids):
+    """Fetch channel details including creation date with efficient batching (1 unit per 50 channels)"""
+    memo = request_memo('channel_details')
+    pending_ids = [channel_id for channel_id in channel_ids if channel_id not in memo]
+    results = cache_get_many('channel_details', pending_ids)
+    uncached_ids = [channel_id for channel_id in pending_ids if channel_id not in results]
     
-    for channel_id in channel_ids:
-        if channel_id in cache.get('channels', {}):
-            results[channel_id] = cache['channels'][channel_id]
-        else:
-            uncached_ids.append(channel_id)
+    def fetch_batch(client, batch):
+        print(f"Fetching details for {len(batch)} channels (1 quota unit)")
+        try:
+            return youtube_api_get(
+                client, 'channels',
+                part='snippet,statistics',
+                id=','.join(batch),
+                fields=CHANNEL_DETAILS_FIELDS
+            )
+        except Exception as e:
+            print(f"Error fetching channel details: {e}")
+            return {}
     
     if uncached_ids:
+        fetched = {}
         try:
-            response = youtube.channels().list(
-                part='statistics',
-                id=','.join(uncached_ids)
-            ).execute()
-            
-            for item in response.get('items', []):
-                channel_data = {
-                    'subscriber_count': int(item['statistics'].get('subscriberCount', 0)),
-                    'video_count': int(item['statistics'].get('videoCount', 0))
-                }
-                results[item['id']] = channel_data
-                
-                if 'channels' not in cache:
-                    cache['channels'] = {}
-                cache['channels'][item['id']] = channel_data
-            
-            save_cache(cache)
+            # Batch requests: up to 50 channel IDs per request
+            # Cost: 1 quota unit per request, batches are fetched concurrently
+            for response in run_in_threads(youtube, fetch_batch, chunk_ids(uncached_ids)):
+                for item in response.get('items', []):
+                    statistics = item.get('statistics', {})
+                    channel_data = {
+                        'channel_id': item['id'],
+                        'title': item['snippet']['title'],
+                        'published_at': item['snippet']['publishedAt'],
+                        'subscriber_count': int(statistics.get('subscriberCount', 0)),
+                        'video_count': int(statistics.get('videoCount', 0)),
+                        'view_count': int(statistics.get('viewCount', 0))
+                    }
+                    fetched[item['id']] = channel_data
         except Exception as e:
-            print(f"Error fetching channel stats: {e}")
+            print(f"Error fetching channel details: {e}")
+        results.update(fetched)
+        cache_put_many('channel_details', fetched)
+    memo.update(results)
     
-    return results
+    return {channel_id: memo[channel_id] for channel_id in channel_ids if channel_id in memo}
+
+def get_channel_stats(youtube, channel_ids):
+    """Fetch channel statistics
+    
+    A projection of get_channel_details: statistics and snippet cost the
+    same single unit per 50 channels, so both share one request and cache entry.
+    """
+    return {
+        channel_id: {'subscriber_count': channel['subscriber_count'], 'video_count': channel['video_count']}
+        for channel_id, channel in get_channel_details(youtube, channel_ids).items()
+    }
+
+def get_uploads_playlist_id(youtube, channel_id):
+    """Look up a channel's uploads playlist ID (1 quota unit, cached)"""
+    cached = cache_get('channel_uploads_playlist', channel_id)
+    if cached is not None:
+        return cached
+    
+    response = youtube_api_get(youtube, 'channels', part='contentDetails', id=channel_id, fields=CHANNEL_UPLOADS_FIELDS)
+    items = response.get('items', [])
+    if not items:
+        return None
+    
+    playlist_id = items[0]['contentDetails']['relatedPlaylists']['uploads']
+    cache_put('channel_uploads_playlist', channel_id, playlist_id)
+    return playlist_id
 
 def get_all_channel_videos(youtube, channel_id, max_videos=50):
-    """Fetch all videos from a channel (up to max_videos)"""
-    cache = load_cache()
-    cache_key = f'channel_videos_{channel_id}_{max_videos}'
+    """Fetch all videos from a channel (up to max_videos)
     
-    if cache_key in cache.get('channel_videos', {}):
-        return cache['channel_videos'][cache_key]
+    Pages the channel's uploads playlist (1 quota unit per page) instead of
+    search.list with channelId (100 units per page).
+    """
+    cache_key = f'{channel_id}_{max_videos}'
+    cached = cache_get('channel_videos', cache_key)
+    if cached is not None:
+        return cached
     
     video_ids = []
     try:
+        uploads_playlist_id = get_uploads_playlist_id(youtube, channel_id)
+        if not uploads_playlist_id:
+            return []
+        
         next_page_token = None
         while len(video_ids) < max_videos:
-            response = youtube.search().list(
-                part='id',
-                channelId=channel_id,
-                type='video',
-                order='date',
+            response = youtube_api_get(
+                youtube, 'playlistItems',
+                part='contentDetails',
+                playlistId=uploads_playlist_id,
                 maxResults=min(50, max_videos - len(video_ids)),
+                fields=PLAYLIST_ITEM_FIELDS,
                 pageToken=next_page_token
-            ).execute()
+            )
             
             for item in response.get('items', []):
-                video_ids.append(item['id']['videoId'])
+                video_ids.append(item['contentDetails']['videoId'])
             
             next_page_token = response.get('nextPageToken')
             if not next_page_token:
                 break
         
-        if 'channel_videos' not in cache:
-            cache['channel_videos'] = {}
-        cache['channel_videos'][cache_key] = video_ids
-        save_cache(cache)
+        cache_put('channel_videos', cache_key, video_ids)
         
         return video_ids
     except Exception as e:
@@ -285,8 +677,7 @@ def get_all_channel_videos(youtube, channel_id, max_videos=50):
 
 def parse_duration(duration):
     """Parse ISO 8601 duration to minutes"""
-    pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
-    match = re.match(pattern, duration)
+    match = DURATION_PATTERN.match(duration)
     if match:
         hours = int(match.group(1) or 0)
         minutes = int(match.group(2) or 0)
@@ -294,138 +685,164 @@ def parse_duration(duration):
         return hours * 60 + minutes + seconds / 60
     return 0
 
+@lru_cache(maxsize=4096)
+def tokenize_title(title):
+    """Split a title into lowercase keyword candidates, dropping stop words and short words
+    
+    Memoized: the same titles come back across /search, /analyze and related-video lookups.
+    """
+    cleaned = PUNCTUATION_PATTERN.sub('', title.lower())
+    return tuple(w for w in cleaned.split() if len(w) > 3 and w not in STOP_WORDS)
+
+def in_analysis_duration(result):
+    """Check whether a calculate_metrics row falls in the 10-30 minute band used by /analyze"""
+    return 10 <= result['duration_min'] <= 30
+
 def extract_keywords(titles, top_n=3):
     """Extract main keywords from video titles"""
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'how', 'what', 'why', 'when', 'where', 'who', 'this', 'that', 'these', 'those', 'i', 'you', 'we', 'they', 'my', 'your', 'our', 'their', 'is', 'are', 'was', 'were', 'be', 'been', 'being'}
-    
-    words = []
-    for title in titles:
-        cleaned = re.sub(r'[^\w\s]', '', title.lower())
-        words.extend([w for w in cleaned.split() if w not in stop_words and len(w) > 3])
-    
-    counter = Counter(words)
+    counter = Counter(chain.from_iterable(map(tokenize_title, titles)))
     return [word for word, count in counter.most_common(top_n)]
 
-def get_related_videos(youtube, video_id, max_results=5):
-    """Fetch related videos using channel-based search as fallback"""
-    cache = load_cache()
-    cache_key = f'related_{video_id}_{max_results}'
+def get_related_videos(youtube, video_id, max_results=5, video_title=None):
+    """Fetch related videos using channel-based search as fallback
     
-    if cache_key in cache.get('related', {}):
-        return cache['related'][cache_key]
+    Always fetches and caches MAX_RELATED_VIDEOS per video, then slices,
+    so /analyze (5) and /related (10) share one search call and cache entry.
+    Callers that already hold the video's title pass it to skip the lookup.
+    """
+    cached = cache_get('related', video_id)
+    if cached is not None:
+        return cached[:max_results]
     
     try:
-        video_info = cache.get('videos', {}).get(video_id)
-        if not video_info:
+        if video_title is None:
             video_data = get_video_details(youtube, [video_id])
-            if video_data:
-                video_info = video_data[0]
+            if not video_data:
+                return []
+            video_title = video_data[0]['title']
         
-        if not video_info:
-            return []
+        keywords = extract_keywords([video_title], top_n=3)
+        search_query = ' '.join(keywords[:2]) if len(keywords) >= 2 else keywords[0] if keywords else video_title[:50]
         
-        keywords = extract_keywords([video_info['title']], top_n=3)
-        search_query = ' '.join(keywords[:2]) if len(keywords) >= 2 else keywords[0] if keywords else video_info['title'][:50]
-        
-        response = youtube.search().list(
+        response = youtube_api_get(
+            youtube, 'search',
             part='snippet',
             q=search_query,
             type='video',
-            maxResults=max_results + 5,
-            order='viewCount'
-        ).execute()
+            maxResults=MAX_RELATED_VIDEOS + 5,
+            order='viewCount',
+            fields=RELATED_SEARCH_FIELDS
+        )
         
         related = []
         for item in response.get('items', []):
-            if item['id']['videoId'] != video_id and len(related) < max_results:
+            if item['id']['videoId'] != video_id and len(related) < MAX_RELATED_VIDEOS:
                 related.append({
                     'video_id': item['id']['videoId'],
                     'title': item['snippet']['title'],
                     'channel_title': item['snippet']['channelTitle']
                 })
         
-        if 'related' not in cache:
-            cache['related'] = {}
-        cache['related'][cache_key] = related
-        save_cache(cache)
+        cache_put('related', video_id, related)
         
-        return related
+        return related[:max_results]
     except Exception as e:
         print(f"Error fetching related videos: {e}")
         return []
 
 def calculate_metrics(video_data, channel_stats):
-    """Calculate all metrics for videos"""
-    results = []
+    """Calculate all metrics for videos in one vectorized pass"""
+    if not video_data:
+        return []
     
-    for video in video_data:
-        channel_id = video['channel_id']
-        channel_info = channel_stats.get(channel_id, {})
-        
-        upload_date = datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00'))
-        days_since_upload = (datetime.now(upload_date.tzinfo) - upload_date).days
-        days_since_upload = max(days_since_upload, 1)
-        
-        duration_minutes = parse_duration(video['duration'])
-        view_velocity = video['views'] / days_since_upload if days_since_upload > 0 else 0
-        engagement = ((video['likes'] + video['comments']) / video['views'] * 100) if video['views'] > 0 else 0
-        
-        subscriber_count = channel_info.get('subscriber_count', 0)
-        video_count = channel_info.get('video_count', 1)
-        
-        competition_score = (
-            (subscriber_count / 1000000 * 40) +
-            (video_count / 1000 * 30) +
-            (view_velocity / 10000 * 30)
+    df = pd.DataFrame(video_data)
+    subscriber_count = df['channel_id'].map(
+        {ch_id: ch.get('subscriber_count', 0) for ch_id, ch in channel_stats.items()}
+    ).fillna(0).astype('int64')
+    video_count = df['channel_id'].map(
+        {ch_id: ch.get('video_count', 1) for ch_id, ch in channel_stats.items()}
+    ).fillna(1).astype('int64')
+    
+    upload_date = pd.to_datetime(df['upload_date'], utc=True, format='ISO8601')
+    days_since_upload = (pd.Timestamp.now(tz='UTC') - upload_date).dt.days.clip(lower=1)
+    
+    duration_parts = df['duration'].str.extract(DURATION_PATTERN).astype('float64').fillna(0.0)
+    duration_minutes = duration_parts[0] * 60 + duration_parts[1] + duration_parts[2] / 60
+    duration_parsed = df['duration'].str.match(DURATION_PATTERN)
+    view_velocity = df['views'] / days_since_upload
+    engagement = (df['likes'] + df['comments']) / df['views'] * 100
+    
+    competition_score = (
+        (subscriber_count / 1000000 * 40) +
+        (video_count / 1000 * 30) +
+        (view_velocity / 10000 * 30)
+    )
+    
+    # Rounded with Python's round: Series.round scales by a power of ten first and can
+    # land on the other side of a half. Object columns keep the int 0 and 100 the
+    # per-video loop returned for unparsed durations, zero views and a capped score.
+    metrics = pd.DataFrame({
+        'video_id': df['video_id'],
+        'title': df['title'],
+        'channel': df['channel_title'],
+        'channel_id': df['channel_id'],
+        'channel_subs': subscriber_count,
+        'views': df['views'],
+        'likes': df['likes'],
+        'comments': df['comments'],
+        'duration_min': pd.Series(
+            [round(d, 1) if ok else 0 for d, ok in zip(duration_minutes.tolist(), duration_parsed.tolist())], dtype=object
+        ),
+        'upload_date': upload_date.dt.strftime('%Y-%m-%d'),
+        'days_since_upload': days_since_upload,
+        'view_velocity': [round(v, 2) for v in view_velocity.tolist()],
+        'engagement_pct': pd.Series(
+            [round(e, 2) if v > 0 else 0 for e, v in zip(engagement.tolist(), df['views'].tolist())], dtype=object
+        ),
+        'competition_score': pd.Series(
+            [100 if c > 100 else round(c, 2) for c in competition_score.tolist()], dtype=object
         )
-        competition_score = min(competition_score, 100)
-        
-        results.append({
-            'video_id': video['video_id'],
-            'title': video['title'],
-            'channel': video['channel_title'],
-            'channel_id': video['channel_id'],
-            'channel_subs': subscriber_count,
-            'views': video['views'],
-            'likes': video['likes'],
-            'comments': video['comments'],
-            'duration_min': round(duration_minutes, 1),
-            'upload_date': upload_date.strftime('%Y-%m-%d'),
-            'days_since_upload': days_since_upload,
-            'view_velocity': round(view_velocity, 2),
-            'engagement_pct': round(engagement, 2),
-            'competition_score': round(competition_score, 2),
-            'tags': video.get('tags', [])
-        })
+    })
+    metrics['tags'] = [video.get('tags', []) for video in video_data]
     
-    return results
+    return metrics.to_dict('records')
 
 def cluster_niches(results):
     """Cluster videos into niches based on keywords"""
     for result in results:
-        keywords = extract_keywords([result['title']], top_n=2)
+        keywords = [word for word, count in Counter(tokenize_title(result['title'])).most_common(2)]
         result['main_keyword'] = keywords[0] if keywords else 'unknown'
-        result['niche'] = ' '.join(keywords[:2]) if len(keywords) >= 2 else keywords[0] if keywords else 'general'
+        result['niche'] = ' '.join(keywords) if keywords else 'general'
     
     return results
 
+def new_niche_entry():
+    """Empty aggregate for a niche in identify_niche_competitors"""
+    return {
+        'channels': {},
+        'total_videos': 0,
+        'avg_engagement': 0,
+        'avg_competition': 0
+    }
+
+video_views = itemgetter('views')
+
+def competitor_rank(channel_data):
+    """Sort key for top competitors: highest engagement first, then lowest competition"""
+    return (channel_data['avg_engagement'], -channel_data['competition_score'])
+
 def identify_niche_competitors(all_results):
     """Identify top-performing competitors in each niche"""
-    niche_data = {}
+    niche_data = defaultdict(new_niche_entry)
     
     for result in all_results:
-        niche = result.get('niche', 'general')
-        if niche not in niche_data:
-            niche_data[niche] = {
-                'channels': {},
-                'total_videos': 0,
-                'avg_engagement': 0,
-                'avg_competition': 0
-            }
+        niche = niche_data[result.get('niche', 'general')]
+        channels = niche['channels']
         
         channel = result['channel']
-        if channel not in niche_data[niche]['channels']:
-            niche_data[niche]['channels'][channel] = {
+        channel_data = channels.get(channel)
+        if channel_data is None:
+            channel_data = channels[channel] = {
                 'channel': channel,
                 'channel_id': result['channel_id'],
                 'channel_subs': result['channel_subs'],
@@ -437,7 +854,6 @@ def identify_niche_competitors(all_results):
                 'videos': []
             }
         
-        channel_data = niche_data[niche]['channels'][channel]
         channel_data['video_count'] += 1
         channel_data['total_views'] += result['views']
         channel_data['total_engagement'] += result['engagement_pct']
@@ -448,48 +864,39 @@ def identify_niche_competitors(all_results):
             'engagement_pct': result['engagement_pct']
         })
         
-        niche_data[niche]['total_videos'] += 1
+        niche['total_videos'] += 1
     
-    for niche, data in niche_data.items():
+    for data in niche_data.values():
         engagement_sum = 0
         competition_sum = 0
         
-        for channel, channel_data in data['channels'].items():
+        for channel_data in data['channels'].values():
             channel_data['avg_engagement'] = channel_data['total_engagement'] / channel_data['video_count']
             engagement_sum += channel_data['avg_engagement']
             competition_sum += channel_data['competition_score']
             
-            channel_data['videos'] = sorted(
-                channel_data['videos'], 
-                key=lambda x: x['views'], 
-                reverse=True
-            )[:5]
+            # nlargest matches sorted(..., reverse=True)[:n], ties included, without a full sort
+            channel_data['videos'] = heapq.nlargest(5, channel_data['videos'], key=video_views)
         
         data['avg_engagement'] = engagement_sum / len(data['channels']) if data['channels'] else 0
         data['avg_competition'] = competition_sum / len(data['channels']) if data['channels'] else 0
         
-        data['top_competitors'] = sorted(
-            data['channels'].values(),
-            key=lambda x: (x['avg_engagement'], -x['competition_score']),
-            reverse=True
-        )[:10]
+        data['top_competitors'] = heapq.nlargest(10, data['channels'].values(), key=competitor_rank)
     
-    return niche_data
+    return dict(niche_data)
 
 def automated_search(youtube, keyword, video_duration='short', max_results=20):
     """Search YouTube for videos by keyword with duration filter
     COST: 100 quota units per search API call
     Default max_results=20 to minimize quota usage (fits in 1 call)
     """
-    from googleapiclient.errors import HttpError
-    
-    cache = load_cache()
-    cache_key = f'search_{keyword}_{video_duration}_{max_results}'
+    cache_key = f'{keyword}_{video_duration}_{max_results}'
     
     # Check cache first - saves 100 units!
-    if cache_key in cache.get('searches', {}):
+    cached = cache_get('searches', cache_key)
+    if cached is not None:
         print(f"Using cached search results for '{keyword}' (saved 100 quota units)")
-        return cache['searches'][cache_key]
+        return cached
     
     try:
         video_ids = []
@@ -501,15 +908,17 @@ def automated_search(youtube, keyword, video_duration='short', max_results=20):
             batch_size = min(50, max_results - len(video_ids))
             print(f"Search API call #{api_calls} for '{keyword}' - fetching {batch_size} results (100 quota units)")
             
-            response = youtube.search().list(
+            response = youtube_api_get(
+                youtube, 'search',
                 part='id',
                 q=keyword,
                 type='video',
                 videoDuration=video_duration,
                 maxResults=batch_size,
                 order='viewCount',
+                fields=SEARCH_FIELDS,
                 pageToken=next_page_token
-            ).execute()
+            )
             
             for item in response.get('items', []):
                 if 'videoId' in item['id']:
@@ -521,24 +930,22 @@ def automated_search(youtube, keyword, video_duration='short', max_results=20):
         
         print(f"Search complete: Found {len(video_ids)} videos using {api_calls * 100} quota units")
         
-        if 'searches' not in cache:
-            cache['searches'] = {}
-        cache['searches'][cache_key] = video_ids
-        save_cache(cache)
+        cache_put('searches', cache_key, video_ids)
         
         return video_ids
-    except HttpError as e:
+    except Exception as e:
         error_message = str(e)
         print(f"Error in automated search: {error_message}")
-        if 'quotaExceeded' in error_message or '403' in str(e.resp.status):
+        if 'quotaExceeded' in error_message or 'HTTP 403' in error_message:
             raise Exception("QUOTA_EXCEEDED")
         raise e
-    except Exception as e:
-        print(f"Error in automated search: {e}")
-        raise e
 
-def filter_by_channel_age(channel_data, max_age_days=None):
-    """Filter channels by age"""
+def filter_by_channel_age(channel_data, max_age_days=None, now=None):
+    """Filter channels by age
+    
+    Args:
+        now: Reference time (UTC); pass it when filtering many channels to avoid a clock read per call
+    """
     if max_age_days is None:
         return True
     
@@ -548,58 +955,11 @@ def filter_by_channel_age(channel_data, max_age_days=None):
     
     try:
         channel_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-        days_old = (datetime.now(channel_date.tzinfo) - channel_date).days
+        days_old = ((now or datetime.now(timezone.utc)) - channel_date).days
         return days_old <= max_age_days
     except:
         return True
 
-def get_channel_details(youtube, channel_ids):
-    """Fetch channel details including creation date with efficient batching (1 unit per 50 channels)"""
-    cache = load_cache()
-    results = {}
-    uncached_ids = []
-    
-    for channel_id in channel_ids:
-        cache_key = f'channel_details_{channel_id}'
-        if cache_key in cache.get('channel_details', {}):
-            results[channel_id] = cache['channel_details'][cache_key]
-        else:
-            uncached_ids.append(channel_id)
-    
-    if uncached_ids:
-        try:
-            # Batch requests: up to 50 channel IDs per request
-            # Cost: 1 quota unit per request
-            for i in range(0, len(uncached_ids), 50):
-                batch = uncached_ids[i:i+50]
-                print(f"Fetching details for {len(batch)} channels (1 quota unit)")
-                
-                response = youtube.channels().list(
-                    part='snippet,statistics',
-                    id=','.join(batch)
-                ).execute()
-                
-                for item in response.get('items', []):
-                    channel_data = {
-                        'channel_id': item['id'],
-                        'title': item['snippet']['title'],
-                        'published_at': item['snippet']['publishedAt'],
-                        'subscriber_count': int(item['statistics'].get('subscriberCount', 0)),
-                        'video_count': int(item['statistics'].get('videoCount', 0)),
-                        'view_count': int(item['statistics'].get('viewCount', 0))
-                    }
-                    results[item['id']] = channel_data
-                    
-                    if 'channel_details' not in cache:
-                        cache['channel_details'] = {}
-                    cache['channel_details'][f'channel_details_{item["id"]}'] = channel_data
-            
-            save_cache(cache)
-        except Exception as e:
-            print(f"Error fetching channel details: {e}")
-    
-    return results
-
 def calculate_potential_score(video_data, channel_data):
     """Calculate potential score for videos (high views, low subs = high potential)"""
     views = video_data.get('views', 0)
@@ -619,6 +979,22 @@ def calculate_potential_score(video_data, channel_data):
     
     return min(base_score, 100)
 
+@app.after_request
+def compress_json_response(response):
+    """Gzip large JSON responses (search and analyze payloads) for clients that accept it"""
+    if (response.mimetype != 'application/json' or response.direct_passthrough or
+            'Content-Encoding' in response.headers or request.accept_encodings['gzip'] <= 0):
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
     """Render the main dashboard"""
@@ -653,10 +1029,11 @@ def search_niche():
         print(f"Found {len(video_ids)} videos, fetching details...")
         video_data = get_video_details(youtube, video_ids)
         
-        channel_ids = list(set([v['channel_id'] for v in video_data]))
+        channel_ids = list({v['channel_id'] for v in video_data})
         print(f"Fetching details for {len(channel_ids)} channels...")
         channel_details = get_channel_details(youtube, channel_ids)
         
+        now = datetime.now(timezone.utc)
         filtered_results = []
         for video in video_data:
             channel_id = video['channel_id']
@@ -670,7 +1047,7 @@ def search_niche():
             if not (min_views <= views <= max_views):
                 continue
             
-            if max_channel_age_days and not filter_by_channel_age(channel_info, max_channel_age_days):
+            if max_channel_age_days and not filter_by_channel_age(channel_info, max_channel_age_days, now):
                 continue
             
             filtered_results.append({
@@ -683,22 +1060,22 @@ def search_niche():
         if not filtered_results:
             return jsonify({'error': 'No videos match your filter criteria'}), 404
         
-        channel_stats = {ch_id: {'subscriber_count': ch['subscriber_count'], 'video_count': ch['video_count']} 
-                        for ch_id, ch in channel_details.items()}
-        
-        results = calculate_metrics([item['video'] for item in filtered_results], channel_stats)
+        results = calculate_metrics([item['video'] for item in filtered_results], channel_details)
         results = cluster_niches(results)
         
-        for i, result in enumerate(results):
-            channel_info = filtered_results[i]['channel']
-            result['potential_score'] = round(calculate_potential_score(filtered_results[i]['video'], channel_info), 2)
-            result['channel_age_days'] = (datetime.now(datetime.fromisoformat(channel_info['published_at'].replace('Z', '+00:00')).tzinfo) - 
-                                         datetime.fromisoformat(channel_info['published_at'].replace('Z', '+00:00'))).days if channel_info.get('published_at') else None
+        channel_ages = {
+            ch_id: (now - datetime.fromisoformat(ch['published_at'].replace('Z', '+00:00'))).days
+            for ch_id, ch in channel_details.items() if ch.get('published_at')
+        }
+        
+        for result in results:
+            channel_info = channel_details.get(result['channel_id'], {})
+            result['potential_score'] = round(calculate_potential_score(result, channel_info), 2)
+            result['channel_age_days'] = channel_ages.get(result['channel_id'])
         
         results = sorted(results, key=lambda x: x['potential_score'], reverse=True)
         
-        seed_df = pd.DataFrame(results)
-        seed_df.to_csv('data/search_results.csv', index=False)
+        write_csv('data/search_results.csv', results, export=True)
         
         return jsonify({
             'success': True,
@@ -714,8 +1091,7 @@ def search_niche():
         })
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in %s", request.path)
         
         error_msg = str(e)
         if 'QUOTA_EXCEEDED' in error_msg:
@@ -737,8 +1113,7 @@ def analyze():
             with open('seeds.txt', 'r') as f:
                 urls = [line.strip() for line in f if line.strip()]
         
-        video_ids = [extract_video_id(url) for url in urls]
-        video_ids = [vid for vid in video_ids if vid]
+        video_ids = extract_video_ids(urls)
         
         if not video_ids:
             return jsonify({'error': 'No valid video IDs found'}), 400
@@ -747,36 +1122,52 @@ def analyze():
         
         video_data = get_video_details(youtube, video_ids)
         
-        channel_ids = list(set([v['channel_id'] for v in video_data]))
+        # Every seed's channel is analysed; only in-band seeds become results and get related videos
+        channel_ids = list({v['channel_id'] for v in video_data})
         channel_stats = get_channel_stats(youtube, channel_ids)
         
-        results = calculate_metrics(video_data, channel_stats)
-        results = [r for r in results if 10 <= r['duration_min'] <= 30]
+        # Filtered on the computed duration_min, so the band check and the output share one parse
+        results = [r for r in calculate_metrics(video_data, channel_stats) if in_analysis_duration(r)]
         results = cluster_niches(results)
         
-        for result in results:
-            related = get_related_videos(youtube, result['video_id'], max_results=5)
+        print(f"Fetching all videos from {len(channel_ids)} channels...")
+        
+        # Related-video searches and channel upload listings are independent, so both fan-outs run at once
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            related_future = executor.submit(
+                run_in_threads,
+                youtube,
+                lambda client, result: get_related_videos(client, result['video_id'], max_results=5, video_title=result['title']),
+                results
+            )
+            channel_video_ids = run_in_threads(
+                youtube,
+                lambda client, channel_id: get_all_channel_videos(client, channel_id, max_videos=50),
+                channel_ids
+            )
+            related_lists = related_future.result()
+        
+        for result, related in zip(results, related_lists):
             result['related_videos'] = related
         
-        all_channel_videos = []
-        print(f"Fetching all videos from {len(channel_ids)} channels...")
+        # One batched videos.list pass over every channel's uploads instead of one per channel
+        all_video_ids = list(dict.fromkeys(vid for ids in channel_video_ids for vid in ids))
+        videos_by_id = {v['video_id']: v for v in get_video_details(youtube, all_video_ids)}
         
-        for channel_id in channel_ids:
-            channel_video_ids = get_all_channel_videos(youtube, channel_id, max_videos=50)
-            if channel_video_ids:
-                channel_video_data = get_video_details(youtube, channel_video_ids)
-                channel_results = calculate_metrics(channel_video_data, channel_stats)
-                channel_results = [r for r in channel_results if 10 <= r['duration_min'] <= 30]
-                channel_results = cluster_niches(channel_results)
-                all_channel_videos.extend(channel_results)
+        channel_video_data = [
+            videos_by_id[vid] for ids in channel_video_ids for vid in ids
+            if vid in videos_by_id
+        ]
+        all_channel_videos = cluster_niches(
+            [r for r in calculate_metrics(channel_video_data, channel_stats) if in_analysis_duration(r)]
+        )
         
         print(f"Analyzed {len(all_channel_videos)} total videos from all channels")
         
         niche_competitors = identify_niche_competitors(all_channel_videos)
         
-        all_videos_df = pd.DataFrame(all_channel_videos) if all_channel_videos else pd.DataFrame()
-        if not all_videos_df.empty:
-            all_videos_df.to_csv('data/all_channel_videos.csv', index=False)
+        if all_channel_videos:
+            write_csv('data/all_channel_videos.csv', all_channel_videos, export=True)
         
         niche_summary = []
         for niche, data in niche_competitors.items():
@@ -789,14 +1180,14 @@ def analyze():
                 'top_competitors': data['top_competitors'][:5]
             })
         
-        niche_summary = sorted(niche_summary, key=lambda x: (-x['avg_engagement'], x['avg_competition']))
+        # Two stable C-keyed sorts: highest engagement first, ties broken by lowest competition
+        niche_summary.sort(key=itemgetter('avg_competition'))
+        niche_summary.sort(key=itemgetter('avg_engagement'), reverse=True)
         
-        niche_df = pd.DataFrame(niche_summary)
-        if not niche_df.empty:
-            niche_df.to_csv('data/niche_competitors.csv', index=False)
+        if niche_summary:
+            write_csv('data/niche_competitors.csv', niche_summary, export=True)
         
-        seed_df = pd.DataFrame(results)
-        seed_df.to_csv('data/results.csv', index=False)
+        write_csv('data/results.csv', results)
         
         return jsonify({
             'success': True,
@@ -807,8 +1198,7 @@ def analyze():
         })
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in %s", request.path)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/related/<video_id>')
@@ -825,7 +1215,7 @@ def get_related(video_id):
 def export_csv():
     """Download results as CSV"""
     try:
-        return send_file('data/search_results.csv', as_attachment=True, download_name='youtube_analysis.csv')
+        return send_csv_export('data/search_results.csv', 'youtube_analysis.csv')
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
@@ -833,7 +1223,7 @@ def export_csv():
 def export_niches_csv():
     """Download niche competitor analysis as CSV"""
     try:
-        return send_file('data/niche_competitors.csv', as_attachment=True, download_name='niche_competitors.csv')
+        return send_csv_export('data/niche_competitors.csv', 'niche_competitors.csv')
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
@@ -841,7 +1231,7 @@ def export_niches_csv():
 def export_all_videos_csv():
     """Download all channel videos as CSV"""
     try:
-        return send_file('data/all_channel_videos.csv', as_attachment=True, download_name='all_channel_videos.csv')
+        return send_csv_export('data/all_channel_videos.csv', 'all_channel_videos.csv')
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
@@ -870,22 +1260,13 @@ def get_account_info():
         try:
             youtube = get_youtube_client()
             
-            response = youtube.channels().list(
-                part='snippet,statistics',
-                mine=True
-            ).execute()
+            response = get_own_channel(youtube)
             
             if response.get('items'):
                 channel = response['items'][0]
-                subscriber_count = channel['statistics'].get('subscriberCount', 'Hidden')
+                subscriber_count = channel.get('statistics', {}).get('subscriberCount', 'Hidden')
                 if subscriber_count != 'Hidden':
-                    subscriber_count = int(subscriber_count)
-                    if subscriber_count >= 1000000:
-                        subscriber_count = f'{subscriber_count/1000000:.1f}M'
-                    elif subscriber_count >= 1000:
-                        subscriber_count = f'{subscriber_count/1000:.1f}K'
-                    else:
-                        subscriber_count = str(subscriber_count)
+                    subscriber_count = format_count(int(subscriber_count))
                 
                 return jsonify({
                     'success': True,
@@ -924,9 +1305,7 @@ def get_account_info():
             }
         })
     except Exception as e:
-        print(f"Error in get_account_info: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_account_info")
         return jsonify({
             'success': False,
             'connected': False,
@@ -937,7 +1316,7 @@ def get_account_info():
 def disconnect_account():
     """Disconnect YouTube account to allow reconnection with different account"""
     try:
-        global connection_settings_cache
+        global connection_settings_cache, own_channel_cache
         
         hostname = os.getenv('REPLIT_CONNECTORS_HOSTNAME')
         if not hostname:
@@ -953,13 +1332,16 @@ def disconnect_account():
         
         headers = get_replit_connector_headers()
         
-        delete_response = requests.delete(
+        delete_response = connector_session.delete(
             f'https://{hostname}/api/v2/connection/{connection_id}',
-            headers=headers
+            headers=headers,
+            timeout=10
         )
         
         if delete_response.status_code in [200, 204]:
-            connection_settings_cache = {'data': None, 'expires_at': None}
+            connection_settings_cache = {'data': None, 'expires_at': None, 'fetched_at': None}
+            own_channel_cache = {'auth': None, 'response': None, 'expires_at': 0.0}
+            reset_youtube_client()
             
             return jsonify({
                 'success': True,
@@ -971,9 +1353,8 @@ def disconnect_account():
             }), 500
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unhandled error in %s", request.path)
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG') == '1')
@@ -0,0 +1,10 @@
+"""Gunicorn settings, loaded automatically when gunicorn starts from the project root.
+
+/search and /analyze spend most of their time waiting on the YouTube API,
+so threaded workers let concurrent requests overlap that network I/O.
+"""
+import os
+
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))